@@ -1,19 +1,67 @@
 import streamlit as st
-from streamlit_extras.stylable_container import stylable_container
-import tempfile
-import os
+from streamlit.errors import StreamlitAPIException
+import io
 import fitz
 import docx
 import filetype
 from PIL import Image
 import google.generativeai as genai
 from gemini_config import GEMINI_API_KEY
-import time
 import base64
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 # Gemini config
-genai.configure(api_key=GEMINI_API_KEY)
-model = genai.GenerativeModel("gemini-1.5-flash")
+MODEL_NAME = "gemini-1.5-flash"
+MAX_CACHED_ANALYSES = 128
+ANALYSIS_CACHE_TTL = 3600  # seconds
+MAX_RESUME_CHARS = 32000  # ~8k tokens
+MAX_UPLOAD_MB = 10  # keep in sync with server.maxUploadSize in .streamlit/config.toml
+
+BASE_PROMPT = """
+You are an expert resume reviewer with 15+ years of HR experience at top tech companies. 
+Analyze this resume comprehensively and provide detailed feedback in the following structure:
+
+### 🔍 Resume Overview
+- Format assessment (ATS compatibility)
+- Document structure evaluation
+- First impressions summary
+
+### 📊 Section-by-Section Analysis
+For each detected section (Education, Experience, Skills, etc.):
+1. **Rating**: /10 with justification
+2. **Strengths**: Bullet points
+3. **Improvements**: Actionable suggestions
+4. **Keywords**: Missing industry terms
+
+### 🎯 Targeted Recommendations
+- Top 3 priority improvements
+- Skills/experiences to highlight
+- Redundant content to remove
+
+### 💯 Overall Score: /100
+With detailed breakdown:
+- Content (40%)
+- Structure (30%)
+- Impact (20%)
+- ATS Optimization (10%)
+
+### ✨ Enhancement Suggestions
+- Power verbs to incorporate
+- Quantifiable achievements to add
+- Modern formatting tips
+
+Format your response in beautiful Markdown with emojis for visual scanning.
+"""
+PROMPT_VERSION = hashlib.md5(BASE_PROMPT.encode()).hexdigest()[:8]
+
+@st.cache_resource
+def get_model():
+    genai.configure(api_key=GEMINI_API_KEY)
+    return genai.GenerativeModel(MODEL_NAME, system_instruction=BASE_PROMPT)
 
 # App config
 st.set_page_config(
@@ -24,8 +72,7 @@ st.set_page_config(
 )
 
 # --- Embedded CSS ---
-def set_css():
-    st.markdown("""
+APP_CSS = """
     <style>
         body, .stApp {
             font-family: "Poppins", "Inter", sans-serif !important;
@@ -36,7 +83,7 @@ def set_css():
             color: #eebbc3;
             font-weight: 700;
         }
-        .stContainer, .stCard, .stMarkdown div[data-testid="stMarkdownContainer"] {
+        .stContainer, .stCard, .stMarkdown div[data-testid="stMarkdownContainer"], div[data-testid="stHtml"] {
             background: #282a3a;
             border-radius: 14px;
             padding: 1.4rem;
@@ -81,82 +128,129 @@ def set_css():
         a {
             color: #80d8ff;
         }
+        /* Cards, keyed st.container(key="card_...") */
+        div[class*="st-key-card_"] {
+            border: 1px solid rgba(49, 51, 63, 0.2);
+            border-radius: 0.5rem;
+            padding: 1rem;
+            background: white;
+            box-shadow: 0 2px 8px rgba(0,0,0,0.1);
+        }
     </style>
-    """, unsafe_allow_html=True)
+    """
+
+def set_css():
+    st.markdown(APP_CSS, unsafe_allow_html=True)
 
 set_css()
 
 # --- Helper functions ---
-def extract_text_from_pdf(pdf_path):
-    doc = fitz.open(pdf_path)
-    return "\n".join([page.get_text() for page in doc])
+@st.cache_data(show_spinner=False, max_entries=32)
+def extract_text_from_pdf(pdf_bytes, max_pages=5):
+    parts = []
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        for i, page in enumerate(doc):
+            if i >= max_pages:
+                break
+            parts.append(page.get_text("text", sort=False))
+    return "\n".join(parts)
 
-def extract_text_from_docx(docx_path):
-    doc = docx.Document(docx_path)
-    return "\n".join([p.text for p in doc.paragraphs])
+@st.cache_data(show_spinner=False, max_entries=32)
+def extract_text_from_docx(docx_bytes):
+    doc = docx.Document(io.BytesIO(docx_bytes))
+    return "\n".join(t for p in doc.paragraphs if (t := p.text.strip()))
 
-def detect_file_type(path):
-    kind = filetype.guess(path)
-    return kind.extension if kind else path.split('.')[-1].lower()
+@st.cache_data(show_spinner=False, max_entries=32)
+def prepare_image(image_bytes, max_edge=1568):
+    with Image.open(io.BytesIO(image_bytes)) as source:
+        image = source.convert("RGB")
+    image.thumbnail((max_edge, max_edge), Image.LANCZOS)
+    jpeg = io.BytesIO()
+    image.save(jpeg, format="JPEG", quality=85)
+    return image, {"mime_type": "image/jpeg", "data": jpeg.getvalue()}
 
-def analyze_with_gemini(input_data, job_description=None):
-    base_prompt = """
-You are an expert resume reviewer with 15+ years of HR experience at top tech companies. 
-Analyze this resume comprehensively and provide detailed feedback in the following structure:
+def detect_file_type(buf):
+    # filetype only inspects the leading signature bytes of the buffer
+    kind = filetype.guess(buf)
+    return kind.extension if kind else ""
 
-### 🔍 Resume Overview
-- Format assessment (ATS compatibility)
-- Document structure evaluation
-- First impressions summary
+def _build_contents(input_data, job_description=None):
+    if isinstance(input_data, str) and len(input_data) > MAX_RESUME_CHARS:
+        input_data = input_data[:MAX_RESUME_CHARS] + "\n[...truncated...]"
+    contents = [input_data]
+    if job_description:
+        contents.append(f"Additionally, optimize this resume for the following job description:\n{job_description}")
+    return contents
 
-### 📊 Section-by-Section Analysis
-For each detected section (Education, Experience, Skills, etc.):
-1. **Rating**: /10 with justification
-2. **Strengths**: Bullet points
-3. **Improvements**: Actionable suggestions
-4. **Keywords**: Missing industry terms
+@st.cache_resource(show_spinner=False)
+def _analysis_cache():
+    # Shared by every session: (lock, finished analyses as key -> (stored_at, text), oldest first)
+    return threading.Lock(), OrderedDict()
 
-### 🎯 Targeted Recommendations
-- Top 3 priority improvements
-- Skills/experiences to highlight
-- Redundant content to remove
+def _get_cached_analysis(key):
+    lock, cache = _analysis_cache()
+    with lock:
+        entry = cache.get(key)
+        if entry is None:
+            return None
+        stored_at, text = entry
+        if time.monotonic() - stored_at > ANALYSIS_CACHE_TTL:
+            del cache[key]
+            return None
+        return text
 
-### 💯 Overall Score: /100
-With detailed breakdown:
-- Content (40%)
-- Structure (30%)
-- Impact (20%)
-- ATS Optimization (10%)
+def _store_analysis(key, text):
+    lock, cache = _analysis_cache()
+    with lock:
+        cache.pop(key, None)
+        cache[key] = (time.monotonic(), text)
+        while len(cache) > MAX_CACHED_ANALYSES:
+            cache.popitem(last=False)
 
-### ✨ Enhancement Suggestions
-- Power verbs to incorporate
-- Quantifiable achievements to add
-- Modern formatting tips
+def analyze_with_gemini(content_hash, input_data, job_description=None):
+    key = (content_hash, job_description, PROMPT_VERSION)
+    cached = _get_cached_analysis(key)
+    if cached is not None:
+        yield cached
+        return
 
-Format your response in beautiful Markdown with emojis for visual scanning.
-"""
-    
-    if job_description:
-        base_prompt += f"\n\nAdditionally, optimize this resume for the following job description:\n{job_description}"
-    
-    response = model.generate_content([base_prompt, input_data])
-    return response.text
+    chunks = []
+    for chunk in get_model().generate_content(_build_contents(input_data, job_description), stream=True):
+        chunks.append(chunk.text)
+        yield chunk.text
+
+    _store_analysis(key, "".join(chunks))
 
-def display_pdf(file_path):
-    with open(file_path, "rb") as f:
-        base64_pdf = base64.b64encode(f.read()).decode('utf-8')
+def analyze_many(analyses, max_workers=4):
+    # Runs several (content_hash, input_data, job_description) analyses concurrently on threads,
+    # which avoids tying the shared model's client to a per-call event loop
+    def run(analysis):
+        return "".join(analyze_with_gemini(*analysis))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(run, analyses))
+
+def display_pdf(pdf_bytes):
+    if hasattr(st, "pdf"):
+        try:
+            st.pdf(pdf_bytes, height=600)
+            return
+        except StreamlitAPIException:
+            # Installs without the streamlit-pdf extra fall back to the inline iframe
+            pass
+    base64_pdf = base64.b64encode(pdf_bytes).decode('utf-8')
     pdf_display = f'<iframe src="data:application/pdf;base64,{base64_pdf}" width="100%" height="600" type="application/pdf"></iframe>'
     st.markdown(pdf_display, unsafe_allow_html=True)
 
 # --- UI Components ---
 def sidebar():
     with st.sidebar:
-        st.markdown("""
+        st.html("""
         <div style="text-align: center; margin-bottom: 2rem">
             <h2>Resume Genius</h2>
             <p>AI-Powered Resume Analysis</p>
         </div>
-        """, unsafe_allow_html=True)
+        """)
         
         with st.expander("⚙️ Analysis Settings", expanded=True):
             analysis_depth = st.select_slider(
@@ -177,9 +271,7 @@ def sidebar():
         - PDFs work best for analysis
         - Keep resumes under 3 pages
         - Remove personal contact info
-        """)
-        
-        st.markdown("""
+
         <div style="text-align: center">
             <small>Powered by Gemini 1.5 Flash</small><br>
             <small>v2.1.0</small>
@@ -195,24 +287,13 @@ def sidebar():
         }
 
 def upload_section():
-    with stylable_container(
-        key="upload_container",
-        css_styles="""
-            {
-                border: 1px solid rgba(49, 51, 63, 0.2);
-                border-radius: 0.5rem;
-                padding: calc(1em - 1px);
-                background: white;
-                box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-            }
-            """
-    ):
-        st.markdown("""
+    with st.container(key="card_upload"):
+        st.html("""
         <div style="text-align: center; padding: 20px 0">
             <h3>📤 Upload Your Resume</h3>
             <p>We accept PDF, DOCX, and image files</p>
         </div>
-        """, unsafe_allow_html=True)
+        """)
         
         uploaded_file = st.file_uploader(
             "Choose a file",
@@ -221,32 +302,14 @@ def upload_section():
         )
         
         if uploaded_file:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=uploaded_file.name) as tmp:
-                tmp.write(uploaded_file.getbuffer())
-                tmp_path = tmp.name
-            return tmp_path, uploaded_file.name
-    return None, None
-
-def analysis_progress():
-    progress_bar = st.progress(0)
-    status_text = st.empty()
-    
-    for i in range(100):
-        progress_bar.progress(i + 1)
-        if i < 20:
-            status_text.text("Extracting text content...")
-        elif i < 50:
-            status_text.text("Analyzing resume structure...")
-        elif i < 80:
-            status_text.text("Evaluating content quality...")
-        else:
-            status_text.text("Finalizing recommendations...")
-        time.sleep(0.02)
-    
-    status_text.success("Analysis complete!")
-    time.sleep(1)
-    status_text.empty()
-    progress_bar.empty()
+            if uploaded_file.size > MAX_UPLOAD_MB * 1024 * 1024:
+                st.error(f"File is too large. Please upload a resume under {MAX_UPLOAD_MB}MB.")
+                return None, None, None, None
+            buf = uploaded_file.getvalue()
+            content_hash = hashlib.sha256(buf).hexdigest()
+            ext = detect_file_type(buf)
+            return buf, uploaded_file.name, content_hash, ext
+    return None, None, None, None
 
 # --- Main App ---
 def main():
@@ -254,83 +317,58 @@ def main():
     settings = sidebar()
     
     # Main content
-    st.markdown("<h2 style='text-align: center; color: #eebbc3;'>AI-Powered Resume Analysis</h2>", unsafe_allow_html=True)
-
-    st.markdown("""
+    st.html("""
+    <h2 style='text-align: center; color: #eebbc3;'>AI-Powered Resume Analysis</h2>
     <div style="text-align: center; margin: 20px 0 40px">
         <p style="font-size: 1.1rem">
         Upload your resume and receive <strong>personalized, actionable feedback</strong> powered by Google's 
         most advanced AI. Our analysis covers content, structure, ATS optimization, and targeted improvements.
         </p>
     </div>
-    """, unsafe_allow_html=True)
+    """)
     
     # File upload
-    file_path, file_name = upload_section()
+    file_bytes, file_name, content_hash, ext = upload_section()
     
-    if file_path:
-        ext = detect_file_type(file_path)
+    if file_bytes:
         input_data = None
         
         # Layout
         col1, col2 = st.columns([1.2, 2], gap="large")
         
         with col1:
-            with stylable_container(
-                key="preview_box",
-                css_styles="""
-                    {
-                        border: 1px solid rgba(49, 51, 63, 0.2);
-                        border-radius: 0.5rem;
-                        padding: 1rem;
-                        background: white;
-                        box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-                    }
-                    """
-            ):
+            with st.container(key="card_preview"):
                 st.markdown(f"### 📄 {file_name}")
                 
                 try:
                     if ext in ["jpg", "jpeg", "png"]:
-                        image = Image.open(file_path).convert("RGB")
-                        input_data = image
+                        image, input_data = prepare_image(file_bytes)
                         st.image(image, use_column_width=True)
                     elif ext == "pdf":
-                        display_pdf(file_path)
-                        text = extract_text_from_pdf(file_path)
+                        display_pdf(file_bytes)
+                        text = extract_text_from_pdf(file_bytes)
                         input_data = text
                     elif ext == "docx":
-                        text = extract_text_from_docx(file_path)
+                        text = extract_text_from_docx(file_bytes)
                         input_data = text
                         st.warning("DOCX preview not available. Content will still be analyzed.")
+                    else:
+                        st.error("Unsupported file type. Please upload a PDF, DOCX, or image file.")
+                        return
                 except Exception as e:
                     st.error(f"Error processing file: {e}")
-                    os.remove(file_path)
                     return
         
         with col2:
             if st.button("**🔍 Analyze Resume**", type="primary", use_container_width=True):
-                analysis_progress()
-                
-                with stylable_container(
-                    key="results_box",
-                    css_styles="""
-                        {
-                            border: 1px solid rgba(49, 51, 63, 0.2);
-                            border-radius: 0.5rem;
-                            padding: 1rem;
-                            background: white;
-                            box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-                        }
-                        """
-                ):
+                with st.container(key="card_results"):
                     with st.spinner("Generating comprehensive analysis..."):
                         try:
-                            analysis = analyze_with_gemini(
-                                input_data, 
+                            analysis = st.write_stream(analyze_with_gemini(
+                                content_hash,
+                                input_data,
                                 settings["job_description"] if settings["job_description"] else None
-                            )
-                            st.markdown(analysis, unsafe_allow_html=True)
+                            ))
                             
                             # Download button for the analysis
                             st.download_button(
@@ -351,26 +389,12 @@ def main():
                     - Use the suggested power verbs in your experience section
                     - Consider our formatting recommendations for better visual hierarchy
                     """)
-        
-        os.remove(file_path)
     
     else:
         # Show demo or features if no file uploaded
-        with stylable_container(
-            key="features_container",
-            css_styles="""
-                {
-                    border: 1px solid rgba(49, 51, 63, 0.2);
-                    border-radius: 0.5rem;
-                    padding: 1rem;
-                    background: white;
-                    box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-                }
-                """
-        ):
-            st.markdown("""
-            ## ✨ What You'll Get
-            
+        with st.container(key="card_features"):
+            st.html("""
+            <h2>✨ What You'll Get</h2>
             <div style="display: grid; grid-template-columns: repeat(2, 1fr); gap: 1rem; margin: 1rem 0">
                 <div style="padding: 1rem; background: #f8f9fa; border-radius: 0.5rem">
                     <h4>🔍 ATS Optimization</h4>
@@ -389,7 +413,7 @@ def main():
                     <p>Advanced tips to make your resume stand out to hiring managers</p>
                 </div>
             </div>
-            """, unsafe_allow_html=True)
+            """)
             
             
 if __name__ == "__main__":